@@ -0,0 +1,81 @@
+# Generated by scripts/gen_coeffs.py from data/segprofile.db; do not edit.
+# Run the script again after changing the database.
+
+DB_SHA256 = '4dfc800492b9c38c79ced10b42fecc2e78b09375ec1cd2035bd8c18daf9afb1a'
+
+# (region, spp, bark) -> (reg4_a, reg4_b, reg17_a, reg17_b, butt_r, butt_c, butt_e, lstem_p, ustem_b, ustem_a)
+MODEL_PARAMS = {
+    ('coastal plain', 'all hardwoods combined', 0): (-0.33014, 0.94215, 0.88948, -1.17512, 7.62604, 0.7078, 19.34425, 12.85326, 1.30536, 0.35815),
+    ('coastal plain', 'all hardwoods combined', 1): (-0.33014, 0.94215, 0.82643, -1.3647, 5.79579, 0.7516, -29.11988, 13.58742, 1.25073, 0.32213),
+    ('coastal plain', 'all pines combined', 0): (-3.8344, 0.91915, 0.90439, -0.64356, 21.01306, 0.50856, 157.11, 7.78474, 2.36095, 0.68914),
+    ('coastal plain', 'all pines combined', 1): (-3.8344, 0.91915, 0.83618, -0.91452, 24.20656, 0.46472, 72.22792, 7.15667, 2.27267, 0.66773),
+    ('coastal plain', 'loblolly pine', 0): (-0.4814, 0.91413, 0.91127, -1.0366, 25.29597, 0.5837, 221.45, 8.88273, 2.39522, 0.70372),
+    ('coastal plain', 'loblolly pine', 1): (-0.4814, 0.91413, 0.84885, -1.30374, 31.6625, 0.57402, 110.96, 8.573, 2.36238, 0.68464),
+    ('coastal plain', 'longleaf pine', 0): (-0.45903, 0.92746, 0.91386, -0.69511, 19.57711, 0.54088, 22.15904, 4.34898, 2.17272, 0.68448),
+    ('coastal plain', 'longleaf pine', 1): (-0.45903, 0.92746, 0.84822, -0.94775, 24.40837, 0.46799, 10.67266, 3.597, 2.03709, 0.65814),
+    ('coastal plain', 'slash pine', 0): (-0.55073, 0.91887, 0.92729, -1.05973, 27.16454, 0.79755, 65.52791, 4.88907, 2.7677, 0.76513),
+    ('coastal plain', 'slash pine', 1): (-0.55073, 0.91887, 0.85504, -1.5226, 32.39761, 0.77487, -2.25836, 4.801, 2.52226, 0.73935),
+    ('deep south', 'all hardwoods combined', 0): (-0.33014, 0.94215, 0.90302, -0.83634, 7.62604, 0.7078, 19.34425, 12.85326, 1.30536, 0.35815),
+    ('deep south', 'all hardwoods combined', 1): (-0.33014, 0.94215, 0.84708, -1.1793, 5.79579, 0.7516, -29.11988, 13.58742, 1.25073, 0.32213),
+    ('deep south', 'all pines combined', 0): (-3.8344, 0.91915, 0.93529, -1.00727, 21.01306, 0.50856, 157.11, 7.78474, 2.36095, 0.68914),
+    ('deep south', 'all pines combined', 1): (-3.8344, 0.91915, 0.87543, -1.30832, 24.20656, 0.46472, 72.22792, 7.15667, 2.27267, 0.66773),
+    ('deep south', 'loblolly pine', 0): (-0.4814, 0.91413, 0.9417, -1.30697, 25.29597, 0.5837, 221.45, 8.88273, 2.39522, 0.70372),
+    ('deep south', 'loblolly pine', 1): (-0.4814, 0.91413, 0.87759, -1.50283, 31.6625, 0.57402, 110.96, 8.573, 2.36238, 0.68464),
+    ('deep south', 'longleaf pine', 0): (-0.45903, 0.92746, 0.94888, -1.04845, 19.57711, 0.54088, 22.15904, 4.34898, 2.17272, 0.68448),
+    ('deep south', 'longleaf pine', 1): (-0.45903, 0.92746, 0.89579, -1.48645, 24.40837, 0.46799, 10.67266, 3.597, 2.03709, 0.65814),
+    ('deep south', 'shortleaf pine', 0): (-0.44121, 0.93045, 0.9405, -1.08472, 24.2675, 0.5326, 107.65, 9.22332, 3.0471, 0.74591),
+    ('deep south', 'shortleaf pine', 1): (-0.44121, 0.93045, 0.88398, -1.31215, 25.43531, 0.45525, 28.38993, 8.21438, 2.86552, 0.72623),
+    ('deep south', 'slash pine', 0): (-0.55073, 0.91887, 0.92169, -0.77285, 27.16454, 0.79755, 65.52791, 4.88907, 2.7677, 0.76513),
+    ('deep south', 'slash pine', 1): (-0.55073, 0.91887, 0.84805, -1.20946, 32.39761, 0.77487, -2.25836, 4.801, 2.52226, 0.73935),
+    ('piedmont', 'all hardwoods combined', 0): (-0.33014, 0.94215, 0.90281, -0.80783, 7.62604, 0.7078, 19.34425, 12.85326, 1.30536, 0.35815),
+    ('piedmont', 'all hardwoods combined', 1): (-0.33014, 0.94215, 0.83911, -1.1569, 5.79579, 0.7516, -29.11988, 13.58742, 1.25073, 0.32213),
+    ('piedmont', 'all pines combined', 0): (-3.8344, 0.91915, 0.92346, -0.96754, 21.01306, 0.50856, 157.11, 7.78474, 2.36095, 0.68914),
+    ('piedmont', 'all pines combined', 1): (-3.8344, 0.91915, 0.84935, -1.01837, 24.20656, 0.46472, 72.22792, 7.15667, 2.27267, 0.66773),
+    ('piedmont', 'loblolly pine', 0): (-0.4814, 0.91413, 0.91747, -1.04471, 25.29597, 0.5837, 221.45, 8.88273, 2.39522, 0.70372),
+    ('piedmont', 'loblolly pine', 1): (-0.4814, 0.91413, 0.84322, -1.14334, 31.6625, 0.57402, 110.96, 8.573, 2.36238, 0.68464),
+    ('piedmont', 'longleaf pine', 0): (-0.45903, 0.92746, 0.94949, -1.11778, 19.57711, 0.54088, 22.15904, 4.34898, 2.17272, 0.68448),
+    ('piedmont', 'longleaf pine', 1): (-0.45903, 0.92746, 0.86684, -1.17085, 24.40837, 0.46799, 10.67266, 3.597, 2.03709, 0.65814),
+    ('piedmont', 'shortleaf pine', 0): (-0.44121, 0.93045, 0.93925, -1.03904, 24.2675, 0.5326, 107.65, 9.22332, 3.0471, 0.74591),
+    ('piedmont', 'shortleaf pine', 1): (-0.44121, 0.93045, 0.8791, -1.3048, 25.43531, 0.45525, 28.38993, 8.21438, 2.86552, 0.72623),
+    ('piedmont', 'virginia pine', 0): (-0.31137, 0.95011, 0.87949, -0.43848, 9.17462, 0.38821, 48.07668, 9.24015, 2.11, 0.62645),
+    ('piedmont', 'virginia pine', 1): (-0.31137, 0.95011, 0.84549, -0.53918, 8.77959, 0.30226, 27.58681, 7.18305, 2.0763, 0.61061),
+    ('southwide', 'all hardwoods combined', 0): (-0.33014, 0.94215, 0.88067, -0.62804, 7.62604, 0.7078, 19.34425, 12.85326, 1.30536, 0.35815),
+    ('southwide', 'all hardwoods combined', 1): (-0.33014, 0.94215, 0.82131, -0.94452, 5.79579, 0.7516, -29.11988, 13.58742, 1.25073, 0.32213),
+    ('southwide', 'all pines combined', 0): (-3.8344, 0.91915, 0.9175, -0.75389, 21.01306, 0.50856, 157.11, 7.78474, 2.36095, 0.68914),
+    ('southwide', 'all pines combined', 1): (-3.8344, 0.91915, 0.85435, -1.01846, 24.20656, 0.46472, 72.22792, 7.15667, 2.27267, 0.66773),
+    ('southwide', 'cherry', 0): (-0.12958, 0.94152, 0.92487, -0.89867, 32.12714, 0.48776, 1.50579, 6.18866, 1.64261, 0.55071),
+    ('southwide', 'cherry', 1): (-0.12958, 0.94152, 0.85449, -0.90888, 32.3451, 0.50231, -11.55418, 6.514, 1.5564, 0.52157),
+    ('southwide', 'loblolly pine', 0): (-0.4814, 0.91413, 0.92022, -1.04015, 25.29597, 0.5837, 221.45, 8.88273, 2.39522, 0.70372),
+    ('southwide', 'loblolly pine', 1): (-0.4814, 0.91413, 0.85561, -1.31295, 31.6625, 0.57402, 110.96, 8.573, 2.36238, 0.68464),
+    ('southwide', 'longleaf pine', 0): (-0.45903, 0.92746, 0.92898, -1.0667, 19.57711, 0.54088, 22.15904, 4.34898, 2.17272, 0.68448),
+    ('southwide', 'longleaf pine', 1): (-0.45903, 0.92746, 0.85759, -1.05479, 24.40837, 0.46799, 10.67266, 3.597, 2.03709, 0.65814),
+    ('southwide', 'slash pine', 0): (-0.55073, 0.91887, 0.93461, -1.09653, 27.16454, 0.79755, 65.52791, 4.88907, 2.7677, 0.76513),
+    ('southwide', 'slash pine', 1): (-0.55073, 0.91887, 0.85411, -1.34827, 32.39761, 0.77487, -2.25836, 4.801, 2.52226, 0.73935),
+    ('southwide', 'virginia pine', 0): (-0.31137, 0.95011, 0.8856, -0.5514, 9.17462, 0.38821, 48.07668, 9.24015, 2.11, 0.62645),
+    ('southwide', 'virginia pine', 1): (-0.31137, 0.95011, 0.84779, -0.57823, 8.77959, 0.30226, 27.58681, 7.18305, 2.0763, 0.61061),
+    ('southwide', 'white pine', 0): (-0.31608, 0.92054, 0.87525, -0.4951, 10.41255, 0.3629, 59.64184, 11.42481, 1.78758, 0.6324),
+    ('southwide', 'white pine', 1): (-0.31608, 0.92054, 0.81014, -0.5731, 12.19768, 0.3584, 19.63087, 10.31373, 1.74982, 0.60458),
+    ('upper coastal plain', 'all hardwoods combined', 0): (-0.33014, 0.94215, 0.92231, -0.83441, 7.62604, 0.7078, 19.34425, 12.85326, 1.30536, 0.35815),
+    ('upper coastal plain', 'all hardwoods combined', 1): (-0.33014, 0.94215, 0.84184, -1.03862, 5.79579, 0.7516, -29.11988, 13.58742, 1.25073, 0.32213),
+    ('upper coastal plain', 'all pines combined', 0): (-3.8344, 0.91915, 0.92503, -0.76642, 21.01306, 0.50856, 157.11, 7.78474, 2.36095, 0.68914),
+    ('upper coastal plain', 'all pines combined', 1): (-3.8344, 0.91915, 0.85116, -0.9148, 24.20656, 0.46472, 72.22792, 7.15667, 2.27267, 0.66773),
+    ('upper coastal plain', 'loblolly pine', 0): (-0.4814, 0.91413, 0.89604, -0.45007, 25.29597, 0.5837, 221.45, 8.88273, 2.39522, 0.70372),
+    ('upper coastal plain', 'loblolly pine', 1): (-0.4814, 0.91413, 0.81431, -0.64282, 31.6625, 0.57402, 110.96, 8.573, 2.36238, 0.68464),
+    ('upper coastal plain', 'shortleaf pine', 0): (-0.44121, 0.93045, 0.93193, -0.55548, 24.2675, 0.5326, 107.65, 9.22332, 3.0471, 0.74591),
+    ('upper coastal plain', 'shortleaf pine', 1): (-0.44121, 0.93045, 0.88173, -1.1005, 25.43531, 0.45525, 28.38993, 8.21438, 2.86552, 0.72623),
+    ('upper coastal plain', 'virginia pine', 0): (-0.31137, 0.95011, 0.84114, 0.10523, 9.17462, 0.38821, 48.07668, 9.24015, 2.11, 0.62645),
+    ('upper coastal plain', 'virginia pine', 1): (-0.31137, 0.95011, 0.80326, 0.01326, 8.77959, 0.30226, 27.58681, 7.18305, 2.0763, 0.61061),
+}
+
+# spp -> tons_per_cuft
+WT_PARAMS = {
+    'all hardwoods combined': 0.0275,
+    'all pines combined': 0.024,
+    'cherry': 0.023,
+    'loblolly pine': 0.027,
+    'longleaf pine': 0.025,
+    'shorleaf pine': 0.0255,
+    'slash pine': 0.028,
+    'virginia pine': 0.021,
+    'white pine': 0.018,
+}
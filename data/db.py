@@ -1,12 +1,42 @@
 # imports
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
-from sqlalchemy import Table, Column, Float, Integer, String
-from sqlalchemy.ext.declarative import declarative_base
+import hashlib
+import os
+import sys
+from collections import namedtuple
+from types import MappingProxyType
 
+from sqlalchemy import create_engine, select, bindparam, event, and_
+from sqlalchemy.orm import sessionmaker, declarative_base
+from sqlalchemy.pool import QueuePool
+from sqlalchemy import Column, Float, Integer, String, Index
 
-engine = create_engine('sqlite:///data/segprofile.db')
-Session = sessionmaker(bind=engine)
+
+# one engine per process; statement compilation is cached on the engine, so
+# repeated lookups of the same shape skip the SQL compiler.  Connections are
+# pooled (most recently used first) so sessions reuse warm SQLite handles
+# instead of reopening the file.
+_DB_PATH = 'data/segprofile.db'
+engine = create_engine(f'sqlite:///{_DB_PATH}',
+                       query_cache_size=1200, future=True,
+                       poolclass=QueuePool, pool_size=8, max_overflow=8,
+                       pool_use_lifo=True,
+                       connect_args={'check_same_thread': False})
+Session = sessionmaker(bind=engine, future=True)
+
+
+@event.listens_for(engine, 'connect')
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    '''
+    Tune each new SQLite connection for a small, read-only reference DB:
+    a 64 MB page cache, in-memory temp storage, memory-mapped reads, and
+    query_only since nothing in stems writes to the database.
+    '''
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA cache_size=-65536')
+    cursor.execute('PRAGMA temp_store=MEMORY')
+    cursor.execute('PRAGMA mmap_size=268435456')
+    cursor.execute('PRAGMA query_only=ON')
+    cursor.close()
 
 Base = declarative_base()
 
@@ -25,6 +55,8 @@ class RegCoeff(Base):
     reg17_a = Column(Float(), nullable=False)
     reg17_b = Column(Float(), nullable=False)
 
+    __table_args__ = (Index('ix_reg_region_spp_bark', 'region', 'spp', 'bark', unique=True),)
+
     # add repr to represent objects
     def __repr__(self):
         return f'''<RegCoeff(region='{self.region}',
@@ -49,6 +81,8 @@ class SegCoeff(Base):
     ustem_b = Column(Float(), nullable=False)
     ustem_a = Column(Float(), nullable=False)
 
+    __table_args__ = (Index('ix_seg_bark_spp', 'bark', 'spp', unique=True),)
+
     # add repr to represent objects
     def __repr__(self):
         return f'''SegCoeff(bark={self.bark},
@@ -70,6 +104,8 @@ class WtCoeff(Base):
     lbs_per_cuft = Column(Integer(), nullable=False)
     tons_per_cuft = Column(Float(), nullable=False)
 
+    __table_args__ = (Index('ix_wt_spp', 'spp', unique=True),)
+
     # add repr to represent objects
     def __repr__(self):
         return f'''WtCoeff(spp='{self.spp}',
@@ -77,3 +113,244 @@ class WtCoeff(Base):
             lbs_per_cuft={self.lbs_per_cuft},
             tons_per_cuft={self.tons_per_cuft})'''
 
+
+
+# coefficient columns read from each table
+_REG_COLUMNS = (RegCoeff.reg4_a, RegCoeff.reg4_b,
+                RegCoeff.reg17_a, RegCoeff.reg17_b)
+_SEG_COLUMNS = (SegCoeff.butt_r, SegCoeff.butt_c, SegCoeff.butt_e,
+                SegCoeff.lstem_p, SegCoeff.ustem_b, SegCoeff.ustem_a)
+
+# immutable record of every coefficient a model needs, in column order
+ModelParams = namedtuple('ModelParams',
+                         [col.name for col in _REG_COLUMNS + _SEG_COLUMNS])
+
+# Lookup statements are built once at import; each call only binds the key
+# values and executes, so the expression tree is never rebuilt.  LIMIT 1
+# lets SQLite stop at the first match even in a database built without
+# the unique indexes.  The regression and segmented-profile rows share spp
+# and bark, so one join returns every coefficient a model needs in a single
+# round-trip.  The weight table only lists some species, so the per-key
+# lookup outer joins it to bring the weight factor along in the same row.
+_MODEL_JOIN = RegCoeff.__table__.join(SegCoeff.__table__, and_(
+                    RegCoeff.spp == SegCoeff.spp,
+                    RegCoeff.bark == SegCoeff.bark))
+
+_MODEL_WT_JOIN = _MODEL_JOIN.outerjoin(WtCoeff.__table__,
+                                       RegCoeff.spp == WtCoeff.spp)
+
+_MODEL_STMT = select(*_REG_COLUMNS, *_SEG_COLUMNS,
+                     WtCoeff.tons_per_cuft).select_from(_MODEL_WT_JOIN).where(
+                        RegCoeff.region == bindparam('region'),
+                        RegCoeff.spp == bindparam('spp'),
+                        RegCoeff.bark == bindparam('bark')).limit(1)
+
+_WT_STMT = select(WtCoeff.tons_per_cuft).where(
+                        WtCoeff.spp == bindparam('spp')).limit(1)
+
+
+# In-process caches for the coefficient tables.  The tables are small and
+# static, so each key only needs to hit the database once per process.
+_MODEL_CACHE = {}
+_WT_CACHE = {}
+
+# read-only views of the caches handed out by preload_coeffs, so callers
+# cannot change what every later lookup sees
+_MODEL_VIEW = MappingProxyType(_MODEL_CACHE)
+_WT_VIEW = MappingProxyType(_WT_CACHE)
+
+# marks a key that has not been looked up yet; None is a cached miss
+_MISSING = object()
+
+# True once the caches hold the whole tables, so a key that is not cached
+# is not in the database either
+_CACHES_COMPLETE = False
+
+
+def _first(session, stmt, params):
+    '''
+    Execute stmt and return its first row.  When session is None a session
+    is opened just for this query, so callers only need one on a cache miss.
+    '''
+    if session is None:
+        with Session() as session:
+            return session.execute(stmt, params).first()
+    return session.execute(stmt, params).first()
+
+
+def lookup_model_params(session, region, spp, bark):
+    '''
+    Get the regression and segmented-profile coefficients for a region,
+    species and bark type with one joined query.  Results are cached, so the
+    database is queried at most once per key.  The same query fills the
+    weight cache for the species, so lookup_wt_params does not need another.
+
+    Parameters
+    ----------
+      session:  SQLAlchemy session instance, or None to open one only if
+                the key is not cached
+      region: string, region name
+      spp: string, species name
+      bark: integer, 0 = outside bark, 1 = inside bark
+
+    Returns
+    -------
+      ModelParams namedtuple, or None if either row is missing
+    '''
+    key = (region, spp, bark)
+    params = _MODEL_CACHE.get(key, _MISSING)
+    if params is _MISSING:
+        if _CACHES_COMPLETE:
+            return None
+        result = _first(session, _MODEL_STMT, {'region': region, 'spp': spp,
+                                               'bark': bark})
+        if result is None:
+            params = None
+        else:
+            params = ModelParams._make(result[:-1])
+            _WT_CACHE.setdefault(spp, result[-1])
+        _MODEL_CACHE[key] = params
+    return params
+
+
+def lookup_wt_params(session, spp):
+    '''
+    Get the green weight conversion factor (tons per ft3) for a species.
+    Results are cached, so the database is queried at most once per species.
+
+    Parameters
+    ----------
+      session:  SQLAlchemy session instance, or None to open one only if
+                the species is not cached
+      spp: string, species name
+
+    Returns
+    -------
+      float, tons per ft3, or None if the species is not listed
+    '''
+    tons_per_cuft = _WT_CACHE.get(spp, _MISSING)
+    if tons_per_cuft is _MISSING:
+        if _CACHES_COMPLETE:
+            return None
+        result = _first(session, _WT_STMT, {'spp': spp})
+        tons_per_cuft = None if result is None else result.tons_per_cuft
+        _WT_CACHE[spp] = tons_per_cuft
+    return tons_per_cuft
+
+
+def query_coeff_rows(session):
+    '''
+    Read every joined model row and every weight row as plain tuples.  Used
+    by preload_coeffs and by scripts/gen_coeffs.py.
+
+    Parameters
+    ----------
+      session:  SQLAlchemy session instance
+
+    Returns
+    -------
+      tuple, a list of (region, spp, bark, *coefficients) rows and a list
+      of (spp, tons per ft3) rows
+    '''
+    stmt = select(RegCoeff.region, RegCoeff.spp, RegCoeff.bark,
+                  *_REG_COLUMNS, *_SEG_COLUMNS).select_from(_MODEL_JOIN)
+    model_rows = [tuple(row) for row in session.execute(stmt)]
+    wt_rows = [tuple(row) for row in
+               session.execute(select(WtCoeff.spp, WtCoeff.tons_per_cuft))]
+    return model_rows, wt_rows
+
+
+def _fill_caches(model_rows, wt_rows):
+    '''
+    Store (region, spp, bark, *coefficients) rows and (spp, tons per ft3)
+    rows in the lookup caches.
+    '''
+    for row in model_rows:
+        # intern the names so they match the keys built by StemProfileModel
+        key = (sys.intern(row[0]), sys.intern(row[1]), row[2])
+        _MODEL_CACHE[key] = ModelParams._make(row[3:])
+
+    for spp, tons_per_cuft in wt_rows:
+        _WT_CACHE[sys.intern(spp)] = tons_per_cuft
+
+
+def preload_coeffs(session=None):
+    '''
+    Fill the lookup caches with every row of the coefficient tables, so
+    models built afterwards never touch the database.  Runs two queries the
+    first time it is called and nothing afterwards.
+
+    Parameters
+    ----------
+      session:  SQLAlchemy session instance, or None to open one only if
+                the caches are not filled yet
+
+    Returns
+    -------
+      tuple, read-only (region, spp, bark) -> ModelParams and
+      spp -> tons per ft3 mappings
+    '''
+    global _CACHES_COMPLETE
+    if _CACHES_COMPLETE:
+        return _MODEL_VIEW, _WT_VIEW
+
+    if session is None:
+        with Session() as session:
+            rows = query_coeff_rows(session)
+    else:
+        rows = query_coeff_rows(session)
+    _fill_caches(*rows)
+
+    # the caches now hold the whole tables, so misses cached by earlier
+    # lookups are redundant; drop them so the views only list real rows
+    for cache in (_MODEL_CACHE, _WT_CACHE):
+        for key in [key for key, value in cache.items() if value is None]:
+            del cache[key]
+    _CACHES_COMPLETE = True
+
+    return _MODEL_VIEW, _WT_VIEW
+
+
+# The coefficient tables can also be generated as literals into
+# data/_coeffs.py by scripts/gen_coeffs.py.  Unless STEMS_COEFFS_BACKEND is
+# set to 'db', they fill the caches at import and the database is never
+# queried for coefficients.  The module records a hash of the database it
+# came from and is ignored once the database changes, so edited
+# coefficients are never shadowed by stale constants.
+COEFFS_BACKEND = os.environ.get('STEMS_COEFFS_BACKEND', 'constants')
+
+
+def db_fingerprint():
+    '''
+    Returns the sha256 hex digest of the database file, or None if the
+    file is missing.
+    '''
+    try:
+        with open(_DB_PATH, 'rb') as f:
+            return hashlib.sha256(f.read()).hexdigest()
+    except OSError:
+        return None
+
+
+def _load_constants():
+    '''
+    Fill the caches from the generated coefficient module, if there is one
+    and it matches the database.
+    '''
+    global _CACHES_COMPLETE
+    if COEFFS_BACKEND == 'db':
+        return
+    try:
+        from data import _coeffs
+    except ImportError:
+        return
+    fingerprint = db_fingerprint()
+    if fingerprint is not None and fingerprint != _coeffs.DB_SHA256:
+        return
+
+    _fill_caches((key + params for key, params in _coeffs.MODEL_PARAMS.items()),
+                 _coeffs.WT_PARAMS.items())
+    _CACHES_COMPLETE = True
+
+
+_load_constants()
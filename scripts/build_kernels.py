@@ -0,0 +1,66 @@
+# imports
+import os
+import sys
+
+from numba.pycc import CC
+
+# build next to stems.py, which imports stems_kernels when it exists
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import stems
+
+
+def _source(kernel):
+    '''
+    Returns the plain Python function behind a kernel, whether or not stems
+    compiled it with numba.
+    '''
+    return getattr(kernel, 'py_func', kernel)
+
+
+def _signature(nargs):
+    '''
+    Returns the pycc signature of a kernel taking nargs floats.
+    '''
+    return 'f8(' + ','.join(['f8'] * nargs) + ')'
+
+
+def _hash_function():
+    '''
+    Returns a function giving stems._kernel_hash() as a literal, which stems
+    compares against its own kernels before using the build.
+    '''
+    namespace = {}
+    exec(f'def kernel_hash():\n    return {stems._kernel_hash()}\n', namespace)
+    return namespace['kernel_hash']
+
+
+def main():
+    '''
+    Compile the stem profile kernels ahead of time into the stems_kernels
+    extension module, so the scalar estimate methods run native code without
+    importing or compiling anything with numba.  stems ignores the module
+    once the kernels in stems.py change, so run it again after changing
+    them; delete the built module to go back to the JIT.
+
+    pycc compiles with numba's default options, not the fast-math flags and
+    numpy error model stems passes to the JIT, so a division by zero raises
+    ZeroDivisionError instead of giving inf or NaN.  numba.pycc is also
+    deprecated and will be removed from a future numba release.
+
+    Usage
+    -----
+      python scripts/build_kernels.py
+    '''
+    cc = CC('stems_kernels')
+    cc.output_dir = ROOT
+    cc.export('calc_diameter', _signature(14))(_source(stems._calc_diameter))
+    cc.export('calc_height', _signature(14))(_source(stems._calc_height))
+    cc.export('calc_volume', _signature(19))(_source(stems._calc_volume))
+    cc.export('kernel_hash', 'i8()')(_hash_function())
+    cc.compile()
+
+
+if __name__ == '__main__':
+    main()
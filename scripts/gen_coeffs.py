@@ -0,0 +1,61 @@
+# imports
+import os
+import sys
+
+# the database path in data.db is relative to the repository root
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+os.chdir(ROOT)
+
+from data.db import Session, ModelParams, db_fingerprint, query_coeff_rows
+
+OUTPUT_PATH = os.path.join('data', '_coeffs.py')
+
+
+def render(model_rows, wt_rows, fingerprint):
+    '''
+    Returns the source of the generated coefficient module.
+
+    Parameters
+    ----------
+      model_rows: list of (region, spp, bark, *coefficients) tuples
+      wt_rows: list of (spp, tons per ft3) tuples
+      fingerprint: string, sha256 of the database the rows came from
+    '''
+    lines = ['# Generated by scripts/gen_coeffs.py from data/segprofile.db; do not edit.',
+             '# Run the script again after changing the database.',
+             '',
+             f'DB_SHA256 = {fingerprint!r}',
+             '',
+             f"# (region, spp, bark) -> ({', '.join(ModelParams._fields)})",
+             'MODEL_PARAMS = {']
+    for row in sorted(model_rows):
+        lines.append(f'    {row[:3]!r}: {row[3:]!r},')
+    lines += ['}',
+              '',
+              '# spp -> tons_per_cuft',
+              'WT_PARAMS = {']
+    for spp, tons_per_cuft in sorted(wt_rows):
+        lines.append(f'    {spp!r}: {tons_per_cuft!r},')
+    lines.append('}')
+    return '\n'.join(lines) + '\n'
+
+
+def main():
+    '''
+    Write the coefficient tables in data/segprofile.db to data/_coeffs.py as
+    literals, which data.db loads at import instead of querying the
+    database.
+
+    Usage
+    -----
+      python scripts/gen_coeffs.py
+    '''
+    with Session() as session:
+        model_rows, wt_rows = query_coeff_rows(session)
+    with open(OUTPUT_PATH, 'w') as f:
+        f.write(render(model_rows, wt_rows, db_fingerprint()))
+
+
+if __name__ == '__main__':
+    main()